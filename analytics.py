@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, inspect, text
+from sqlalchemy.dialects.sqlite import insert
+from models import db, Prediction, PredictionRollup
+
+# Features copied from the form data into typed Prediction columns
+TYPED_FEATURES = ['body', 'fuel_type', 'drive_wheel', 'engine_size', 'horsepower']
+
+# 'all' keeps a single all-time bucket so totals never scan hourly rows
+ROLLUP_PERIODS = ['hour', 'day', 'all']
+ALL_TIME = datetime(1970, 1, 1)
+
+def bucket_start(period, timestamp):
+    """Start of the rollup bucket that timestamp falls into"""
+    if period == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if period == 'day':
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return ALL_TIME
+
+def _bump_rollups(body, fuel_type, price, timestamp):
+    """Add one prediction to every rollup bucket it belongs to"""
+    for period in ROLLUP_PERIODS:
+        stmt = insert(PredictionRollup).values(
+            period=period,
+            bucket_start=bucket_start(period, timestamp),
+            body=body,
+            fuel_type=fuel_type,
+            prediction_count=1,
+            price_sum=price,
+            price_min=price,
+            price_max=price
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['period', 'bucket_start', 'body', 'fuel_type'],
+            set_={
+                'prediction_count': PredictionRollup.prediction_count + 1,
+                'price_sum': PredictionRollup.price_sum + stmt.excluded.price_sum,
+                'price_min': func.min(PredictionRollup.price_min, stmt.excluded.price_min),
+                'price_max': func.max(PredictionRollup.price_max, stmt.excluded.price_max)
+            }
+        )
+        db.session.execute(stmt)
+
+def record_prediction(user_id, form_data, predicted_price):
+    """Store a prediction with its typed columns and update the rollups.
+
+    Runs in the caller's transaction; the caller commits.
+    """
+    now = datetime.utcnow()
+    prediction = Prediction(
+        user_id=user_id,
+        car_data=form_data,
+        predicted_price=predicted_price,
+        created_at=now,
+        **{name: form_data[name] for name in TYPED_FEATURES}
+    )
+    db.session.add(prediction)
+    _bump_rollups(form_data['body'], form_data['fuel_type'], float(predicted_price), now)
+    return prediction
+
+def rebuild_rollups():
+    """Recompute all rollups from the prediction table (one-off backfill)"""
+    PredictionRollup.query.delete()
+    for prediction in Prediction.query.yield_per(500):
+        _bump_rollups(prediction.body, prediction.fuel_type,
+                      prediction.predicted_price, prediction.created_at)
+    db.session.commit()
+
+def upgrade_schema():
+    """Add the typed columns to a prediction table created before they existed"""
+    table = Prediction.__table__
+    existing = {column['name'] for column in inspect(db.engine).get_columns(table.name)}
+    missing = [name for name in TYPED_FEATURES if name not in existing]
+    if not missing:
+        return
+
+    for name in missing:
+        column_type = table.c[name].type.compile(dialect=db.engine.dialect)
+        db.session.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"))
+    db.session.commit()
+    for index in table.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+
+    # Backfill from the JSON blobs once, then build the rollups from the typed columns
+    for prediction in Prediction.query.yield_per(500):
+        for name in TYPED_FEATURES:
+            setattr(prediction, name, (prediction.car_data or {}).get(name))
+    db.session.commit()
+    rebuild_rollups()
+
+def _read(stmt):
+    """Run a dashboard query on the read-only catalog pool, off the write lock"""
+    return db.session.execute(stmt, bind_arguments={'bind': db.engines['catalog']}).all()
+
+def _all_time_totals(column):
+    return _read(db.select(
+        column,
+        func.sum(PredictionRollup.prediction_count),
+        func.sum(PredictionRollup.price_sum)
+    ).where(PredictionRollup.period == 'all').group_by(column).order_by(column))
+
+def volume_by_body():
+    """Number of predictions per body type"""
+    return [{'body': body, 'count': count}
+            for body, count, _ in _all_time_totals(PredictionRollup.body)]
+
+def average_price_by_fuel_type():
+    """Average predicted price per fuel type"""
+    return [{'fuel_type': fuel_type, 'count': count, 'average_price': round(total / count, 2)}
+            for fuel_type, count, total in _all_time_totals(PredictionRollup.fuel_type)]
+
+def price_trend(period='day', buckets=30):
+    """Prediction volume and average predicted price for the most recent buckets"""
+    step = timedelta(hours=1) if period == 'hour' else timedelta(days=1)
+    since = bucket_start(period, datetime.utcnow()) - step * (buckets - 1)
+    rows = _read(db.select(
+        PredictionRollup.bucket_start,
+        func.sum(PredictionRollup.prediction_count),
+        func.sum(PredictionRollup.price_sum)
+    ).where(
+        PredictionRollup.period == period,
+        PredictionRollup.bucket_start >= since
+    ).group_by(PredictionRollup.bucket_start).order_by(PredictionRollup.bucket_start))
+    return [{'bucket_start': start, 'count': count, 'average_price': round(total / count, 2)}
+            for start, count, total in rows]
@@ -1,18 +1,32 @@
 import os
+from datetime import datetime
 import numpy as np
 import pandas as pd
-from flask import Flask, render_template, request, redirect, url_for, flash
-from models import db, Car, User, Prediction
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from models import db, Car, User
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import mean_absolute_error
 import joblib
+import json
+import database
+import analytics
+import drift
 
-app = Flask(__name__)
+# CAR_PRICE_INSTANCE_PATH (absolute) moves the SQLite database and the other
+# instance files elsewhere, e.g. a throwaway directory for load tests
+app = Flask(__name__, instance_path=os.environ.get('CAR_PRICE_INSTANCE_PATH'))
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///car_price.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'your-secret-key-here'
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database.engine_options(pool_size=10)
+# Read-only pool on the same file for catalog (Car) queries, so they never
+# queue behind the write lock held by /predict
+app.config['SQLALCHEMY_BINDS'] = {
+    'catalog': {'url': app.config['SQLALCHEMY_DATABASE_URI'],
+                **database.engine_options(pool_size=10)}
+}
 
 db.init_app(app)
 
@@ -43,14 +57,18 @@ def validate_input_ranges(form_data):
     
     return errors
 
-# Create database tables
+# Configure connection pools and create database tables
 with app.app_context():
+    database.configure_engine(db.engine)
+    database.configure_engine(db.engines['catalog'], read_only=True)
     db.create_all()
+    analytics.upgrade_schema()
 
 # Load and preprocess data
 def load_data():
     # Check if data already exists in database
-    if Car.query.count() == 0:
+    catalog = {'bind': db.engines['catalog']}
+    if db.session.scalar(db.select(db.func.count(Car.id)), bind_arguments=catalog) == 0:
         df = pd.read_csv('CarPrice_Assignment.csv')
         
         # Clean and prepare data
@@ -90,7 +108,7 @@ def load_data():
         db.session.commit()
     
     # Query data from database
-    cars = Car.query.all()
+    cars = db.session.execute(db.select(Car), bind_arguments=catalog).scalars().all()
     data = {
         'symboling': [car.symboling for car in cars],
         'fuel_type': [car.fuel_type for car in cars],
@@ -120,14 +138,31 @@ def load_data():
     
     return pd.DataFrame(data)
 
+# Model artifact and dropdown values are loaded once per process and reused.
+# serve.py fills these in the master before forking so workers share the pages.
+_model_cache = None
+_dropdown_cache = None
+_drift_monitor = None
+
+MODEL_PATH = 'car_price_model.pkl'
+
 # Train or load model
 def get_model():
-    model_path = 'car_price_model.pkl'
+    global _model_cache
+    if _model_cache is None:
+        _model_cache = _load_or_train_model()
+    return _model_cache
+
+def _load_or_train_model():
+    model_path = MODEL_PATH
     if os.path.exists(model_path):
         return joblib.load(model_path)
     else:
         df = load_data()
         
+        # Sketch the raw training inputs for the drift monitor
+        reference = drift.build_reference(df)
+        
         # Encode categorical variables
         categorical_cols = ['fuel_type', 'aspiration', 'doors', 'body', 'drive_wheel', 
                           'engine_location', 'engine_type', 'cylinders', 'fuel_system']
@@ -153,16 +188,46 @@ def get_model():
         mae = mean_absolute_error(y_test, y_pred)
         print(f"Model trained with MAE: ${mae:.2f}")
         
-        # Save model and encoders
+        # Save model, encoders and reference sketches
         joblib.dump({
             'model': model,
-            'encoders': label_encoders
+            'encoders': label_encoders,
+            'reference': reference
         }, model_path)
         
-        return {'model': model, 'encoders': label_encoders}
+        return {'model': model, 'encoders': label_encoders, 'reference': reference}
+
+def get_drift_monitor():
+    global _drift_monitor
+    if _drift_monitor is None:
+        model_data = get_model()
+        if 'reference' not in model_data:
+            # Artifacts trained before drift monitoring carry no sketches; add
+            # them to the artifact once, without retraining the model
+            model_data['reference'] = drift.build_reference(load_data())
+            joblib.dump(model_data, MODEL_PATH)
+        # Created before serve.py forks, so all workers share its windows
+        _drift_monitor = drift.DriftMonitor(model_data['reference'], on_retrain=signal_retrain)
+    return _drift_monitor
+
+def signal_retrain(drifted_features):
+    """Record that live inputs drifted far enough from training to retrain"""
+    app.logger.warning(f"Input drift detected in {', '.join(drifted_features)}; retrain recommended")
+    os.makedirs(app.instance_path, exist_ok=True)
+    with open(os.path.join(app.instance_path, 'retrain_signal.json'), 'w') as f:
+        json.dump({
+            'drifted_features': drifted_features,
+            'created_at': datetime.utcnow().isoformat()
+        }, f)
 
 # Get unique values for dropdowns
 def get_dropdown_values():
+    global _dropdown_cache
+    if _dropdown_cache is None:
+        _dropdown_cache = _build_dropdown_values()
+    return _dropdown_cache
+
+def _build_dropdown_values():
     df = load_data()
     return {
         'fuel_types': sorted(df['fuel_type'].unique()),
@@ -176,6 +241,18 @@ def get_dropdown_values():
         'fuel_systems': sorted(df['fuel_system'].unique())
     }
 
+def preload():
+    """Load the model, encoders and dropdown values into the process caches"""
+    with app.app_context():
+        get_model()
+        get_dropdown_values()
+        get_drift_monitor()
+        # SQLite connections must not be shared across fork; release the
+        # session's checked-out connections, then close the pools
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -241,20 +318,29 @@ def predict():
             db.session.add(user)
             db.session.commit()
         
-        # Save prediction to database
-        prediction = Prediction(
-            user_id=user.id,
-            car_data=form_data,
-            predicted_price=predicted_price
-        )
-        db.session.add(prediction)
+        # Save prediction to database and update the history rollups
+        analytics.record_prediction(user.id, form_data, predicted_price)
         db.session.commit()
         
+        # Only predictions that were stored count towards drift
+        get_drift_monitor().update(form_data)
+        
         return render_template('results.html', 
                              form_data=form_data,
                              predicted_price=round(predicted_price, 2))
     
     return render_template('predict.html', dropdown_values=dropdown_values)
 
+@app.route('/analytics')
+def prediction_analytics():
+    return render_template('analytics.html',
+                         volume_by_body=analytics.volume_by_body(),
+                         price_by_fuel_type=analytics.average_price_by_fuel_type(),
+                         daily_trend=analytics.price_trend('day', 30))
+
+@app.route('/drift')
+def drift_scores():
+    return jsonify(get_drift_monitor().scores())
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -2,17 +2,73 @@ import sqlite3
 from sqlite3 import Error
 import pandas as pd
 import os
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
 
-def create_connection(db_file):
+# How long a connection waits on a locked database before giving up
+BUSY_TIMEOUT_SECONDS = 5.0
+
+# Pragmas applied to every connection opened by this module or the Flask app.
+# WAL lets readers run alongside the single writer, NORMAL sync is safe in WAL
+# mode, and the mmap window serves catalog reads straight from the page cache.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(BUSY_TIMEOUT_SECONDS * 1000),
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+def apply_pragmas(conn, read_only=False):
+    """Apply the connection pragmas; read-only connections reject writes"""
+    cursor = conn.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+def create_connection(db_file, read_only=False):
     """Create a database connection to the SQLite database specified by db_file"""
     conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        conn = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT_SECONDS,
+                               check_same_thread=False)
+        apply_pragmas(conn, read_only=read_only)
         return conn
     except Error as e:
         print(e)
     return conn
 
+def engine_options(pool_size=10):
+    """SQLAlchemy engine options for a pooled SQLite engine"""
+    return {
+        'poolclass': QueuePool,
+        'pool_size': pool_size,
+        'max_overflow': pool_size,
+        'connect_args': {
+            'timeout': BUSY_TIMEOUT_SECONDS,
+            'check_same_thread': False,
+        },
+    }
+
+def configure_engine(engine, read_only=False):
+    """Apply the pragmas to every pooled connection of a SQLAlchemy engine.
+
+    Transactions on a writable engine start with BEGIN IMMEDIATE and hold the
+    write lock until commit, so only work that writes should use it; send
+    read-only queries to a read_only engine.
+    """
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy's begin event below control transactions
+        dbapi_connection.isolation_level = None
+        apply_pragmas(dbapi_connection, read_only=read_only)
+
+    @event.listens_for(engine, 'begin')
+    def on_begin(conn):
+        conn.exec_driver_sql("BEGIN" if read_only else "BEGIN IMMEDIATE")
+
 def create_tables(conn):
     """Create tables in the SQLite database"""
     try:
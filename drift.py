@@ -0,0 +1,315 @@
+import math
+import multiprocessing
+from collections import Counter
+
+# Features sketched by the monitor, matching the model's input columns
+NUMERIC_FEATURES = ['symboling', 'wheel_base', 'car_length', 'car_width', 'car_height',
+                    'curb_weight', 'engine_size', 'bore_ratio', 'stroke', 'compression',
+                    'horsepower', 'peak_rpm', 'city_mpg', 'highway_mpg']
+CATEGORICAL_FEATURES = ['fuel_type', 'aspiration', 'doors', 'body', 'drive_wheel',
+                        'engine_location', 'engine_type', 'cylinders', 'fuel_system']
+
+HISTOGRAM_BINS = 10
+# Common rule of thumb: PSI above 0.2 means the population has shifted
+PSI_THRESHOLD = 0.2
+# Scores on fewer live samples than this are too noisy to act on; with ~200
+# training rows and 10 bins, PSI noise at 500 samples is around 0.06
+MIN_SAMPLES = 500
+# Proportion used in place of an empty bin so PSI stays finite
+EPSILON = 1e-4
+
+class NumericSketch:
+    """Running moments and a fixed-bin histogram of one numeric feature"""
+
+    def __init__(self, low, high, bins=HISTOGRAM_BINS):
+        self.low = float(low)
+        self.high = float(high)
+        self.bins = bins
+        self.width = (self.high - self.low) / bins or 1.0
+        self.counts = [0] * bins
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, value):
+        value = float(value)
+        # Out-of-range values land in the edge bins
+        index = min(max(int((value - self.low) / self.width), 0), self.bins - 1)
+        self.counts[index] += 1
+        # Welford's update of mean and sum of squared deviations
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other):
+        """Combine two sketches with the same bin edges into a new one"""
+        merged = NumericSketch(self.low, self.high, self.bins)
+        merged.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        merged.n = self.n + other.n
+        if merged.n:
+            delta = other.mean - self.mean
+            merged.mean = self.mean + delta * other.n / merged.n
+            merged.m2 = self.m2 + other.m2 + delta * delta * self.n * other.n / merged.n
+        return merged
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / self.n) if self.n else 0.0
+
+    def proportions(self):
+        return [count / self.n if self.n else 0.0 for count in self.counts]
+
+    def empty_copy(self):
+        return NumericSketch(self.low, self.high, self.bins)
+
+    def to_dict(self):
+        return {'low': self.low, 'high': self.high, 'bins': self.bins,
+                'counts': list(self.counts), 'n': self.n, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['low'], data['high'], data['bins'])
+        sketch.counts = list(data['counts'])
+        sketch.n = data['n']
+        sketch.mean = data['mean']
+        sketch.m2 = data['m2']
+        return sketch
+
+class CategorySketch:
+    """Counts per category of one categorical feature"""
+
+    def __init__(self, categories):
+        self.categories = list(categories)
+        self.counts = Counter()
+        self.n = 0
+
+    def update(self, value):
+        self.counts[value] += 1
+        self.n += 1
+
+    def merge(self, other):
+        merged = CategorySketch(self.categories)
+        merged.counts = self.counts + other.counts
+        merged.n = self.n + other.n
+        return merged
+
+    def proportions(self):
+        return [self.counts[category] / self.n if self.n else 0.0
+                for category in self.categories]
+
+    def empty_copy(self):
+        return CategorySketch(self.categories)
+
+    def to_dict(self):
+        return {'categories': self.categories, 'counts': dict(self.counts), 'n': self.n}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['categories'])
+        sketch.counts = Counter(data['counts'])
+        sketch.n = data['n']
+        return sketch
+
+def build_reference(df):
+    """Sketch the training features; the result is stored with the model artifact"""
+    numeric = {}
+    for feature in NUMERIC_FEATURES:
+        values = df[feature]
+        sketch = NumericSketch(values.min(), values.max())
+        for value in values:
+            sketch.update(value)
+        numeric[feature] = sketch.to_dict()
+
+    categorical = {}
+    for feature in CATEGORICAL_FEATURES:
+        sketch = CategorySketch(sorted(df[feature].unique()))
+        for value in df[feature]:
+            sketch.update(value)
+        categorical[feature] = sketch.to_dict()
+
+    return {'numeric': numeric, 'categorical': categorical}
+
+def psi(expected, actual):
+    """Population stability index between two lists of bin proportions"""
+    total = 0.0
+    for e, a in zip(expected, actual):
+        e = max(e, EPSILON)
+        a = max(a, EPSILON)
+        total += (a - e) * math.log(a / e)
+    return total
+
+def ks_statistic(expected, actual):
+    """Largest gap between the binned cumulative distributions"""
+    gap = 0.0
+    cum_expected = 0.0
+    cum_actual = 0.0
+    for e, a in zip(expected, actual):
+        cum_expected += e
+        cum_actual += a
+        gap = max(gap, abs(cum_expected - cum_actual))
+    return gap
+
+class DriftMonitor:
+    """Streaming comparison of live /predict inputs against the training sketches.
+
+    Live inputs go into a current window; once it holds `window` samples it
+    replaces the previous one. Scores use both windows, so they cover the most
+    recent `window` to `2 * window` predictions. Updates are O(1) per feature.
+
+    The windows live in shared memory guarded by a process-shared lock. Build
+    the monitor before forking (serve.py preloads it in the master) and every
+    worker updates and scores the same counts, and the retrain signal fires
+    once per drift episode across all of them.
+    """
+
+    def __init__(self, reference, window=500, threshold=PSI_THRESHOLD,
+                 min_samples=MIN_SAMPLES, on_retrain=None):
+        self.reference = {
+            feature: NumericSketch.from_dict(data)
+            for feature, data in reference['numeric'].items()
+        }
+        self.reference.update({
+            feature: CategorySketch.from_dict(data)
+            for feature, data in reference['categorical'].items()
+        })
+        self.window = window
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.on_retrain = on_retrain
+
+        # Flat layout of one window: numeric features hold their bin counts
+        # followed by n, mean and m2; categorical features hold one count per
+        # category, one for unseen categories, then n
+        self._offsets = {}
+        self._category_index = {}
+        size = 0
+        for feature, sketch in self.reference.items():
+            self._offsets[feature] = size
+            if isinstance(sketch, NumericSketch):
+                size += sketch.bins + 3
+            else:
+                self._category_index[feature] = {
+                    category: i for i, category in enumerate(sketch.categories)
+                }
+                size += len(sketch.categories) + 2
+        self._window_size = size
+        self._lock = multiprocessing.Lock()
+        self._counts = multiprocessing.RawArray('d', 2 * size)
+        # Current window slot, samples in it, and whether retrain was signalled
+        self._state = multiprocessing.RawArray('d', 3)
+
+    @property
+    def retrain_requested(self):
+        return bool(self._state[2])
+
+    def _update_window(self, base, inputs):
+        counts = self._counts
+        for feature, sketch in self.reference.items():
+            start = base + self._offsets[feature]
+            value = inputs[feature]
+            if isinstance(sketch, NumericSketch):
+                value = float(value)
+                index = min(max(int((value - sketch.low) / sketch.width), 0), sketch.bins - 1)
+                counts[start + index] += 1
+                # Welford's update of mean and sum of squared deviations
+                n_at = start + sketch.bins
+                counts[n_at] += 1
+                delta = value - counts[n_at + 1]
+                counts[n_at + 1] += delta / counts[n_at]
+                counts[n_at + 2] += delta * (value - counts[n_at + 1])
+            else:
+                categories = self._category_index[feature]
+                counts[start + categories.get(value, len(categories))] += 1
+                counts[start + len(categories) + 1] += 1
+
+    def _read_window(self, slot):
+        """Copy one shared window into sketch objects"""
+        counts = self._counts
+        base = slot * self._window_size
+        sketches = {}
+        for feature, reference in self.reference.items():
+            start = base + self._offsets[feature]
+            sketch = reference.empty_copy()
+            if isinstance(sketch, NumericSketch):
+                sketch.counts = [int(c) for c in counts[start:start + sketch.bins]]
+                sketch.n = int(counts[start + sketch.bins])
+                sketch.mean = counts[start + sketch.bins + 1]
+                sketch.m2 = counts[start + sketch.bins + 2]
+            else:
+                k = len(sketch.categories)
+                sketch.counts = Counter({
+                    category: int(counts[start + i])
+                    for i, category in enumerate(sketch.categories)
+                })
+                sketch.n = int(counts[start + k + 1])
+            sketches[feature] = sketch
+        return sketches
+
+    def update(self, inputs):
+        """Add one prediction's inputs to the live sketches"""
+        rotated = False
+        with self._lock:
+            slot = int(self._state[0])
+            self._update_window(slot * self._window_size, inputs)
+            self._state[1] += 1
+            if self._state[1] >= self.window:
+                # The older window becomes the new current one, emptied
+                slot = 1 - slot
+                base = slot * self._window_size
+                self._counts[base:base + self._window_size] = [0.0] * self._window_size
+                self._state[0] = slot
+                self._state[1] = 0
+                rotated = True
+        # Re-score once per window so the retrain signal fires without polling
+        if rotated:
+            self.scores()
+
+    def scores(self):
+        """PSI and KS-style scores per feature over the recent windows"""
+        with self._lock:
+            current = self._read_window(int(self._state[0]))
+            previous = self._read_window(1 - int(self._state[0]))
+        live = {feature: sketch.merge(previous[feature]) for feature, sketch in current.items()}
+
+        features = {}
+        for feature, reference in self.reference.items():
+            sketch = live[feature]
+            expected = reference.proportions()
+            actual = sketch.proportions()
+            score = {
+                'psi': round(psi(expected, actual), 4) if sketch.n else None,
+                'ks': round(ks_statistic(expected, actual), 4) if sketch.n else None,
+            }
+            if isinstance(sketch, NumericSketch):
+                score['reference_mean'] = round(reference.mean, 4)
+                score['live_mean'] = round(sketch.mean, 4) if sketch.n else None
+                # Shift of the live mean in units of the training standard deviation
+                if sketch.n and reference.std:
+                    score['mean_shift'] = round((sketch.mean - reference.mean) / reference.std, 4)
+                else:
+                    score['mean_shift'] = None
+            features[feature] = score
+
+        samples = max((sketch.n for sketch in live.values()), default=0)
+        drifted = sorted(feature for feature, score in features.items()
+                         if score['psi'] is not None and score['psi'] >= self.threshold)
+        retrain = samples >= self.min_samples and bool(drifted)
+        with self._lock:
+            signal = retrain and not self._state[2]
+            if signal:
+                self._state[2] = 1
+            elif samples >= self.min_samples and not drifted:
+                # Inputs are back in line (e.g. after a retrain); re-arm the
+                # signal for the next drift episode
+                self._state[2] = 0
+        if signal and self.on_retrain:
+            self.on_retrain(drifted)
+
+        return {
+            'samples': samples,
+            'threshold': self.threshold,
+            'drifted_features': drifted,
+            'retrain_recommended': retrain,
+            'features': features,
+        }
@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+import urllib.request
+import urllib.parse
+from urllib.error import URLError
+
+# A valid car from CarPrice_Assignment.csv, in the shape the /predict form posts
+SAMPLE_FORM = {
+    'symboling': 3, 'fuel_type': 'gas', 'aspiration': 'std', 'doors': 'two',
+    'body': 'convertible', 'drive_wheel': 'rwd', 'engine_location': 'front',
+    'wheel_base': 88.6, 'car_length': 168.8, 'car_width': 64.1, 'car_height': 48.8,
+    'curb_weight': 2548, 'engine_type': 'dohc', 'cylinders': 'four', 'engine_size': 130,
+    'fuel_system': 'mpfi', 'bore_ratio': 3.47, 'stroke': 2.68, 'compression': 9.0,
+    'horsepower': 111, 'peak_rpm': 5000, 'city_mpg': 21, 'highway_mpg': 27
+}
+
+
+def wait_until_ready(url, timeout=60):
+    """Poll the server until it answers or the timeout expires"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return True
+        except (URLError, ConnectionError):
+            time.sleep(0.25)
+    return False
+
+
+def client(url, body, duration, counter, errors):
+    """Send requests back to back for duration seconds and record the counts"""
+    done = 0
+    failed = 0
+    end = time.time() + duration
+    try:
+        while time.time() < end:
+            try:
+                urllib.request.urlopen(url, data=body, timeout=30).read()
+                done += 1
+            except (URLError, ConnectionError, TimeoutError):
+                failed += 1
+    finally:
+        with counter.get_lock():
+            counter.value += done
+        with errors.get_lock():
+            errors.value += failed
+
+
+def run_load(url, clients, duration):
+    """Drive the server from several client processes; return requests/sec and errors"""
+    body = urllib.parse.urlencode(SAMPLE_FORM).encode()
+    counter = multiprocessing.Value('i', 0)
+    errors = multiprocessing.Value('i', 0)
+    procs = [multiprocessing.Process(target=client, args=(url, body, duration, counter, errors))
+             for _ in range(clients)]
+    start = time.time()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    return counter.value / (time.time() - start), errors.value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure requests/sec per core for 1..N workers')
+    parser.add_argument('--max-workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--clients-per-worker', type=int, default=2)
+    parser.add_argument('--port', type=int, default=8050)
+    args = parser.parse_args()
+
+    base = f'http://127.0.0.1:{args.port}'
+    cpus = os.cpu_count() or 1
+    print(f"req/s/core divides by min(workers, {cpus} CPUs); "
+          f"the clients run on the same cores")
+    print(f"{'workers':>8} {'req/s':>10} {'req/s/core':>12} {'scaling':>8} {'errors':>8}")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        # Each run gets its own throwaway database and instance files, so the
+        # repeated sample input never reaches instance/car_price.db
+        with tempfile.TemporaryDirectory() as instance_path:
+            env = dict(os.environ, CAR_PRICE_INSTANCE_PATH=instance_path)
+            server = subprocess.Popen([sys.executable, 'serve.py',
+                                       '--bind', f'127.0.0.1:{args.port}',
+                                       '--workers', str(workers)], env=env)
+            try:
+                if not wait_until_ready(base + '/'):
+                    print(f"Server with {workers} workers did not start")
+                    break
+                rps, errors = run_load(base + '/predict', workers * args.clients_per_worker,
+                                       args.duration)
+            finally:
+                server.terminate()
+                server.wait()
+
+        baseline = baseline or rps
+        scaling = f"{rps / baseline:.2f}x" if baseline else 'n/a'
+        print(f"{workers:>8} {rps:>10.1f} {rps / min(workers, cpus):>12.1f} "
+              f"{scaling:>8} {errors:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -42,4 +42,26 @@ class Prediction(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     car_data = db.Column(db.JSON)
     predicted_price = db.Column(db.Float)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Copied out of car_data at write time so reports can filter without parsing JSON
+    body = db.Column(db.String(30), index=True)
+    fuel_type = db.Column(db.String(20), index=True)
+    drive_wheel = db.Column(db.String(20))
+    engine_size = db.Column(db.Integer)
+    horsepower = db.Column(db.Integer)
+
+class PredictionRollup(db.Model):
+    """Prediction counts and price totals per time bucket, body and fuel type"""
+    __table_args__ = (
+        db.UniqueConstraint('period', 'bucket_start', 'body', 'fuel_type'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(10), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    body = db.Column(db.String(30), nullable=False)
+    fuel_type = db.Column(db.String(20), nullable=False)
+    prediction_count = db.Column(db.Integer, nullable=False, default=0)
+    price_sum = db.Column(db.Float, nullable=False, default=0.0)
+    price_min = db.Column(db.Float)
+    price_max = db.Column(db.Float)
\ No newline at end of file
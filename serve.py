@@ -0,0 +1,77 @@
+import os
+import gc
+import argparse
+import multiprocessing
+
+# Pin native thread pools before NumPy/scikit-learn are imported so every
+# forked worker inherits the limit instead of spawning one thread per core.
+THREADS_PER_WORKER = os.environ.get('THREADS_PER_WORKER', '1')
+for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+            'NUMEXPR_NUM_THREADS', 'LOKY_MAX_CPU_COUNT'):
+    os.environ.setdefault(var, THREADS_PER_WORKER)
+
+from gunicorn.app.base import BaseApplication
+from threadpoolctl import threadpool_limits
+
+import app as car_app
+
+
+def preload_shared_state():
+    """Load the model artifact and lookup tables once in the master process"""
+    car_app.preload()
+
+    # Trees are evaluated in the request thread; joblib must not fan out again
+    model = car_app.get_model()['model']
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+
+    # Move everything allocated so far out of the collector's reach so that
+    # gc passes in the workers do not touch (and copy) the shared pages.
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Re-apply the thread limits inside each worker after fork"""
+    threadpool_limits(limits=int(THREADS_PER_WORKER))
+
+
+class CarPriceServer(BaseApplication):
+    """Gunicorn application serving the preloaded Flask app with forked workers"""
+
+    def __init__(self, application, options=None):
+        self.application = application
+        self.options = options or {}
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the car price predictor with multiple workers')
+    parser.add_argument('--bind', default='127.0.0.1:8000')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--timeout', type=int, default=30)
+    args = parser.parse_args()
+
+    preload_shared_state()
+
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'worker_class': 'sync',
+        'timeout': args.timeout,
+        'preload_app': True,
+        'post_fork': post_fork,
+    }
+    CarPriceServer(car_app.app, options).run()
+
+
+if __name__ == '__main__':
+    main()
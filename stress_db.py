@@ -0,0 +1,69 @@
+import time
+import argparse
+import tempfile
+import threading
+from flask import Flask
+from sqlalchemy.exc import OperationalError
+import database
+import analytics
+from models import db
+from loadtest import SAMPLE_FORM
+
+
+def create_app(instance_path, tuned):
+    """Minimal app on a throwaway database, with or without the database.py tuning"""
+    app = Flask(__name__, instance_path=instance_path)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///stress.db'
+    if tuned:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database.engine_options()
+    db.init_app(app)
+    with app.app_context():
+        if tuned:
+            database.configure_engine(db.engine)
+        db.create_all()
+    return app
+
+
+def writer(app, writes, errors):
+    """Save predictions the way /predict does, one transaction each"""
+    with app.app_context():
+        for i in range(writes):
+            try:
+                analytics.record_prediction(None, SAMPLE_FORM, 10000.0 + i)
+                db.session.commit()
+            except OperationalError:
+                db.session.rollback()
+                errors.append(1)
+
+
+def run(label, app, writers, writes):
+    """Run writers concurrently and print throughput and lock errors"""
+    errors = []
+    threads = [threading.Thread(target=writer, args=(app, writes, errors))
+               for _ in range(writers)]
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - start
+    done = writers * writes - len(errors)
+    print(f"{label:>8} {done:>8} {done / elapsed:>12.1f} {len(errors):>8}")
+    with app.app_context():
+        db.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent /predict write throughput of the SQLite settings')
+    parser.add_argument('--writers', type=int, default=32)
+    parser.add_argument('--writes', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'engine':>8} {'writes':>8} {'writes/sec':>12} {'locked':>8}")
+    for label, tuned in (('default', False), ('tuned', True)):
+        with tempfile.TemporaryDirectory() as instance_path:
+            run(label, create_app(instance_path, tuned), args.writers, args.writes)
+
+
+if __name__ == '__main__':
+    main()